@@ -10,10 +10,16 @@
 #-
 
 import enum
+import functools
+import math
 from collections import \
     namedtuple
 import os
+import types
+import concurrent.futures
 import array
+import struct
+import threading
 import ctypes as ct
 import qahirah as qah
 from qahirah import \
@@ -164,30 +170,93 @@ class COLOUR_MODEL(enum.Enum) :
             self == COLOUR_MODEL.RGBA8888
     #end rearrange
 
+    @property
+    def bytes_per_pixel(self) :
+        "the number of bytes occupied by each pixel; the same for all Frei0r colour models."
+        return \
+            4
+    #end bytes_per_pixel
+
+    def swap_channels_to(self, other, buf, dimensions = None) :
+        "converts the pixels in buf in-place from this colour model to the other one." \
+        " buf and dimensions are interpreted as for swap_red_blue(). Only conversions" \
+        " between BGRA8888 and RGBA8888 are possible, apart from the trivial one from" \
+        " a colour model to itself."
+        if other != self :
+            if {self, other} != {COLOUR_MODEL.BGRA8888, COLOUR_MODEL.RGBA8888} :
+                raise ValueError("no conversion from %s to %s" % (self, other))
+            #end if
+            swap_red_blue(buf, dimensions)
+        #end if
+    #end swap_channels_to
+
 #end COLOUR_MODEL
 
+def swap_red_blue(buf, dimensions = None) :
+    "swaps the first and third bytes of each 4-byte pixel in buf, thereby converting" \
+    " in-place between BGRA8888 and RGBA8888 colour models. If dimensions is None," \
+    " then buf must be a writable object supporting the buffer protocol, and all of" \
+    " it is converted. Otherwise buf can be any of the frame types accepted by" \
+    " Plugin.Instance.update(), including qahirah.ImageSurface objects and raw" \
+    " addresses, and is assumed to hold a frame of the given dimensions."
+    surface = None
+    if dimensions != None :
+        if isinstance(buf, qah.ImageSurface) :
+            surface = buf
+            surface.flush()
+        #end if
+        width, height = dimensions
+        buf = (ct.c_ubyte * (width * height * 4)).from_address(get_frame_arg(buf))
+    #end if
+    pixels = memoryview(buf).cast("B")
+    if len(pixels) % 4 != 0 :
+        raise ValueError("buffer length is not a whole number of pixels")
+    #end if
+    # The extended-slice copies are done in C, with no per-pixel Python loop.
+    # They are several times faster on a bytearray than on a memoryview, so
+    # even with the extra copies it is quicker to do them on a temporary
+    # bytearray where buf is not already one.
+    if type(buf) is bytearray :
+        staging = buf
+    else :
+        staging = bytearray(pixels)
+    #end if
+    staging[0::4], staging[2::4] = staging[2::4], staging[0::4]
+    if staging is not buf :
+        pixels[:] = staging
+    #end if
+    if surface != None :
+        surface.mark_dirty()
+    #end if
+#end swap_red_blue
+
 @enum.unique
-class PARAM(enum.Enum) :
-    "the types of parameters that Frei0r plugins may accept."
+class PARAM(enum.IntEnum) :
+    "the types of parameters that Frei0r plugins may accept. These compare equal" \
+    " to the corresponding raw F0R.PARAM_xxx codes."
     BOOL = 0
     DOUBLE = 1
     COLOUR = 2
     POSITION = 3
     STRING = 4
 
+    # keep displaying as names, not numbers
+    __str__ = enum.Enum.__str__
+    __format__ = enum.Enum.__format__
+
     @property
     def f0r_type(self) :
         return \
-            type(self)._f0r_type[self]
+            self._ctype
     #end f0r_type
 
     def to_f0r(self, val, c_val) :
-        type(self)._to_f0r[self](val, c_val)
+        self._to_f0r_fn(val, c_val)
     #end to_f0r
 
     def from_f0r(self, c_val) :
         return \
-            type(self)._from_f0r[self](c_val)
+            self._from_f0r_fn(c_val)
     #end from_f0r
 
 #end PARAM
@@ -205,17 +274,23 @@ def to_f0r_bool(b, fb) :
 def to_f0r_float(f, ff) :
     ff.value = f
 #end to_f0r_float
+# Colour and position structs are read and written in a single operation
+# on their memory, rather than going through the ctypes field descriptors
+# one component at a time.
+_colour_layout = struct.Struct("@3f") # must match F0R.param_colour_t
+_position_layout = struct.Struct("@2d") # must match F0R.param_position_t
 def to_f0r_colour(c, fc) :
-    fc.r = c.r
-    fc.g = c.g
-    fc.b = c.b
+    _colour_layout.pack_into(fc, 0, c.r, c.g, c.b)
 #end to_f0r_colour
 def to_f0r_position(p, fp) :
-    fp.x = p.x
-    fp.y = p.y
+    _position_layout.pack_into(fp, 0, p.x, p.y)
 #end to_f0r_position
 def to_f0r_string(s, fs) :
-    fs.value = s.encode()
+    if isinstance(s, bytes) :
+        fs.value = s # no need to encode
+    else :
+        fs.value = s.encode()
+    #end if
 #end to_f0r_string
 PARAM._to_f0r = \
     {
@@ -225,48 +300,150 @@ PARAM._to_f0r = \
         PARAM.POSITION : to_f0r_position,
         PARAM.STRING : to_f0r_string,
     }
+def from_f0r_bool(fb) :
+    return \
+        fb.value >= 0.5
+#end from_f0r_bool
+def from_f0r_float(ff) :
+    return \
+        ff.value
+#end from_f0r_float
 def from_f0r_colour(fc) :
+    r, g, b = _colour_layout.unpack_from(fc)
     return \
-        Colour(fc.r, fc.g, fc.b, 1)
+        Colour(r, g, b, 1)
 #end from_f0r_colour
 def from_f0r_position(fp) :
     return \
-        Vector(fp.x, fp.y)
+        Vector(*_position_layout.unpack_from(fp))
 #end from_f0r_position
+def from_f0r_string(fs) :
+    return \
+        fs.value.decode()
+#end from_f0r_string
 PARAM._from_f0r = \
     {
-        PARAM.BOOL : lambda f : f.value >= 0.5,
-        PARAM.DOUBLE : lambda f : f.value,
+        PARAM.BOOL : from_f0r_bool,
+        PARAM.DOUBLE : from_f0r_float,
         PARAM.COLOUR : from_f0r_colour,
         PARAM.POSITION : from_f0r_position,
-        PARAM.STRING : lambda f : f.value.decode(),
+        PARAM.STRING : from_f0r_string,
     }
 del to_f0r_bool, to_f0r_float, to_f0r_colour, to_f0r_position, to_f0r_string
-del from_f0r_colour, from_f0r_position
+del from_f0r_bool, from_f0r_float, from_f0r_colour, from_f0r_position, from_f0r_string
+# also attach the above directly to each member, to save the table lookups
+for param_type in PARAM :
+    param_type._ctype = PARAM._f0r_type[param_type]
+    param_type._to_f0r_fn = PARAM._to_f0r[param_type]
+    param_type._from_f0r_fn = PARAM._from_f0r[param_type]
+#end for
+del param_type
 
 plugin_info = namedtuple("PluginInfo", tuple(f[0] for f in F0R.plugin_info_t._fields_))
 plugin_info.__doc__ = "information about a Frei0r plugin"
-param_info = namedtuple("PluginParamInfo", tuple(f[0] for f in F0R.param_info_t._fields_) + ("index",))
-param_info.__doc__ = "information about a parameter of a Frei0r plugin"
+
+class ParamInfo :
+    "information about a parameter of a Frei0r plugin. Also caches the ctypes type" \
+    " and conversion functions for the parameter type, so getting and setting" \
+    " parameter values need not go through the PARAM lookup tables every time."
+
+    __slots__ = ("name", "type", "explanation", "index", "_ctype", "_to_f0r", "_from_f0r")
+
+    def __init__(self, name, type, explanation, index) :
+        self.name = name
+        self.type = type
+        self.explanation = explanation
+        self.index = index
+        self._ctype = type._ctype
+        self._to_f0r = type._to_f0r_fn
+        self._from_f0r = type._from_f0r_fn
+    #end __init__
+
+    @classmethod
+    def from_struct(celf, c_info, index) :
+        "decodes an F0R.param_info_t struct for the parameter with the specified index."
+        explanation = c_info.explanation
+        if explanation is not None :
+            explanation = explanation.decode()
+        #end if
+        return \
+            celf \
+              (
+                name = c_info.name.decode(),
+                type = PARAM(c_info.type),
+                explanation = explanation,
+                index = index
+              )
+    #end from_struct
+
+    # The following make this behave like the namedtuple that was formerly
+    # used for parameter info.
+
+    _fields = ("name", "type", "explanation", "index")
+
+    def __iter__(self) :
+        return \
+            iter((self.name, self.type, self.explanation, self.index))
+    #end __iter__
+
+    def __len__(self) :
+        return \
+            len(self._fields)
+    #end __len__
+
+    def __getitem__(self, i) :
+        return \
+            tuple(self)[i]
+    #end __getitem__
+
+    def __eq__(self, other) :
+        if isinstance(other, (ParamInfo, tuple)) :
+            result = tuple(self) == tuple(other)
+        else :
+            result = NotImplemented
+        #end if
+        return \
+            result
+    #end __eq__
+
+    def __hash__(self) :
+        return \
+            hash(tuple(self))
+    #end __hash__
+
+    def _asdict(self) :
+        return \
+            dict(zip(self._fields, self))
+    #end _asdict
+
+    def __repr__(self) :
+        return \
+            (
+                "PluginParamInfo(name=%r, type=%r, explanation=%r, index=%r)"
+            %
+                (self.name, self.type, self.explanation, self.index)
+            )
+    #end __repr__
+
+#end ParamInfo
+param_info = ParamInfo # for compatibility with code that referenced the original namedtuple
 
 def decode_struct(structval, structtype, tupletype, enum_remap, extra) :
     result = []
     for fieldname, fieldtype in structtype._fields_ :
         attr = getattr(structval, fieldname)
         if fieldtype is ct.c_char_p :
-            result.append \
-              (
-                (lambda : None, lambda : attr.decode())[fieldname == "name" or attr != None]()
-              )
-        else :
-            if fieldname in enum_remap :
-                attr = enum_remap[fieldname](attr)
+            if fieldname == "name" or attr is not None :
+                attr = attr.decode()
             #end if
-            result.append(attr)
+        elif fieldname in enum_remap :
+            attr = enum_remap[fieldname](attr)
         #end if
+        result.append(attr)
     #end for
+    result.extend(extra)
     return \
-        tupletype(*(tuple(result) + extra))
+        tupletype(*result)
 #end decode_struct
 
 subdir_name = "frei0r-1"
@@ -274,6 +451,14 @@ directories = None
   # caller can set to a list of directories to be searched for plugins
   # before invoking get_directories or find_all, to override default
   # search
+_loaded_plugins = {}
+  # Plugins already returned by find_all_in, keyed by (st_dev, st_ino) of the
+  # containing directory plus the file name, so repeated searches need not
+  # load them again
+_plugin_names = {}
+  # names of all plugins loaded by find_all_in, with the same keys as above,
+  # so shadowed ones need not be kept loaded just to find out they are
+  # shadowed again
 
 # TODO: icons
 
@@ -304,23 +489,50 @@ def get_directories(vendor = None) :
 #end get_directories
 
 def find_all_in(dirs) :
-    "iterates over all plugin instances that can be found in the specified directories."
+    "iterates over all plugin instances that can be found in the specified directories." \
+    " Plugins loaded by a previous call are returned again, rather than being reloaded."
     seen = set()
+    seen_dirs = set()
     for dir in dirs :
-        if os.path.isdir(dir) :
-            for item in os.listdir(dir) :
-                if item.endswith(".so") :
-                    libname = os.path.join(dir, item)
-                    if os.path.isfile(libname) :
-                        plugin = Plugin(libname)
-                        if plugin.info.name not in seen :
-                            seen.add(plugin.info.name)
-                            yield plugin
-                        #end if
-                    #end if
+        try :
+            info = os.stat(dir)
+            dir_id = (info.st_dev, info.st_ino)
+            if dir_id in seen_dirs :
+                # same directory already listed under another name, e.g. via
+                # a symlink; no point loading the plugins again only to have
+                # them all be shadowed by the earlier ones
+                continue
+            #end if
+            seen_dirs.add(dir_id)
+            entries = os.scandir(dir)
+        except (FileNotFoundError, NotADirectoryError) :
+            continue
+        #end try
+        candidates = [] # list of (libname, key into _loaded_plugins)
+        with entries :
+            for entry in entries :
+                # file type usually comes from directory entry without needing a stat call
+                if entry.name.endswith(".so") and entry.is_file() :
+                    candidates.append((entry.path, dir_id + (entry.name,)))
                 #end if
             #end for
-        #end if
+        #end with
+        for libname, key in candidates :
+            # loaded only as needed, so the caller gets each plugin as soon as possible
+            plugin = _loaded_plugins.get(key)
+            name = _plugin_names.get(key)
+            if plugin == None and (name == None or name not in seen) :
+                plugin = Plugin(libname)
+                name = plugin.info.name
+                _plugin_names[key] = name
+            #end if
+            if name not in seen :
+                seen.add(name)
+                _loaded_plugins[key] = plugin
+                yield plugin
+            #end if
+            plugin = None # don’t hang on to a shadowed one
+        #end for
     #end for
 #end find_all_in
 
@@ -336,65 +548,241 @@ def get_all(vendor = None) :
         dict((plugin.info.name, plugin) for plugin in find_all(vendor))
 #end get_all
 
+def invalidate_cache() :
+    "forgets all plugins loaded by previous searches, so that the next call to" \
+    " find_all_in, find_all or get_all creates new Plugin objects for them, and" \
+    " picks up any plugins added, removed or renamed since. Note that while any" \
+    " Plugin object for a library file is still alive, the dynamic loader keeps" \
+    " that library loaded, and loading the same pathname again gets the existing" \
+    " copy, even if the file has since been replaced. The old and new Plugin" \
+    " objects then share the one library, and the old one’s deinitialization" \
+    " when it is collected affects the new one too. So drop all references to" \
+    " previously returned Plugins before calling this."
+    _loaded_plugins.clear()
+    _plugin_names.clear()
+#end invalidate_cache
+
 max_image_dimension = 2048 # width and height cannot exceed this
 image_dimension_modulo = 8 # width and height must be exact multiples of this
 
+@functools.lru_cache(maxsize = 32, typed = True)
+def _dimensions_ok(width, height, max_dimension, modulo) :
+    # returns (width, height) if valid, else None. The limits are passed
+    # as arguments so that changing them does not leave stale results
+    # in the cache.
+    width, height = Vector(width, height).assert_isint()
+    if modulo & (modulo - 1) == 0 :
+        # power of 2, as it usually is
+        mask = modulo - 1
+        multiples = width & mask == 0 and height & mask == 0
+    else :
+        multiples = width % modulo == 0 and height % modulo == 0
+    #end if
+    if multiples and max_dimension >= width > 0 and max_dimension >= height > 0 :
+        result = (width, height)
+    else :
+        result = None
+    #end if
+    return \
+        result
+#end _dimensions_ok
+
 def check_dimensions_ok(dimensions, where = None) :
     "checks that the Vector dimensions is suitable as the dimensions of an image" \
     " for Frei0r to operate on."
-    width, height = Vector.from_tuple(dimensions).assert_isint()
-    assert max_image_dimension >= width > 0 and max_image_dimension >= height > 0 and width % image_dimension_modulo == 0 and height % image_dimension_modulo == 0, \
-        "invalid image dimensions%s" % (lambda : "", lambda : " %s" % where)[where != None]()
+    width, height = dimensions
+    result = _dimensions_ok(width, height, max_image_dimension, image_dimension_modulo)
+    if result is None :
+        raise AssertionError \
+          (
+            "invalid image dimensions%s" % ("" if where is None else " %s" % where)
+          )
+    #end if
     return \
-        Vector(width, height)
+        Vector(*result)
 #end check_dimensions_ok
 
-def get_frame_arg(frame) :
-    "returns the integer base address of a frame buffer."
-    # Not bothering to check alignment requirements!
-    if isinstance(frame, ct.c_void_p) :
-        baseaddr = frame.value
-    elif isinstance(frame, array.array) :
-        baseaddr = frame.buffer_info()[0]
-    elif isinstance(frame, bytearray) :
-        baseaddr = ct.addressof((ct.c_char * len(frame)).from_buffer(frame))
-    elif isinstance(frame, qah.ImageSurface) :
-        # Not bothering to check pixel/dimensions compatibility!
-        baseaddr = frame.data
-    elif frame == None :
-        baseaddr = None
+_scratch = threading.local()
+
+def _scratch_struct(structtype) :
+    "returns a zero-filled instance of the ctypes structtype for temporary use." \
+    " The same instance is reused for subsequent calls from the same thread," \
+    " so its contents must be finished with before the next call."
+    structs = getattr(_scratch, "structs", None)
+    if structs == None :
+        structs = {}
+        _scratch.structs = structs
+    #end if
+    result = structs.get(structtype)
+    if result == None :
+        result = structtype()
+        structs[structtype] = result
     else :
-        raise TypeError("wrong type for frame arg")
+        ct.memset(ct.addressof(result), 0, ct.sizeof(result))
+    #end if
+    return \
+        result
+#end _scratch_struct
+
+# Not bothering to check alignment requirements, or pixel/dimensions
+# compatibility for an ImageSurface!
+def buffer_frame_arg(frame) :
+    # only need the address of the first byte, no need to create
+    # a new array type sized to the whole buffer every time
+    return \
+        ct.addressof(ct.c_char.from_buffer(frame))
+#end buffer_frame_arg
+_frame_arg_handlers = \
+    { # dispatch on exact type of frame arg
+        int : lambda f : f, # raw address, only exact int, not subclasses
+        ct.c_void_p : lambda f : f.value,
+        array.array : lambda f : f.buffer_info()[0],
+        bytearray : buffer_frame_arg,
+        memoryview : buffer_frame_arg, # must be writable and C-contiguous
+        qah.ImageSurface : lambda f : f.data,
+        pixman.Image : lambda f : f.data,
+        type(None) : lambda f : None,
+    }
+del buffer_frame_arg
+
+def _array_interface_frame_arg(frame) :
+    interface = frame.__array_interface__
+    if interface.get("strides") != None :
+        raise ValueError("frame array must be C-contiguous")
     #end if
     return \
-        baseaddr
+        interface["data"][0]
+#end _array_interface_frame_arg
+
+def get_frame_arg(frame) :
+    "returns the integer base address of a frame buffer. Besides the explicitly" \
+    " supported types, this accepts any object implementing the NumPy array" \
+    " interface, such as an ndarray, without copying. Whatever the type, the buffer" \
+    " must be C-contiguous, with 4 bytes per pixel in the plugin’s colour model."
+    frametype = type(frame)
+    handler = _frame_arg_handlers.get(frametype)
+    if handler == None :
+        # not one of the known types: look for a handler for the nearest base
+        # class, as functools.singledispatch would, and remember it so the
+        # next frame of this type is dispatched directly
+        for basetype in frametype.__mro__[1:] :
+            if basetype is int :
+                # raw addresses must be exactly int: a bool or IntEnum
+                # is surely a mistake, and must not be passed as an address
+                continue
+            #end if
+            handler = _frame_arg_handlers.get(basetype)
+            if handler != None :
+                break
+        else :
+            if hasattr(frame, "__array_interface__") :
+                handler = _array_interface_frame_arg
+            else :
+                raise TypeError("wrong type for frame arg")
+            #end if
+        #end for
+        _frame_arg_handlers[frametype] = handler
+    #end if
+    return \
+        handler(frame)
 #end get_frame_arg
 
+def _get_out_frame_arg(frame) :
+    # like get_frame_arg, but for a frame the plugin is to write into. A read-only
+    # array is fine as an input frame, but must not be accepted here. (Read-only
+    # bytes-like objects are already rejected, by ctypes from_buffer.)
+    address = get_frame_arg(frame)
+    if (
+            _frame_arg_handlers[type(frame)] is _array_interface_frame_arg
+        and
+            frame.__array_interface__["data"][1]
+    ) :
+        raise TypeError("output frame array must be writable")
+    #end if
+    return \
+        address
+#end _get_out_frame_arg
+
+def frame_as_memoryview(frame, dimensions) :
+    "returns a writable memoryview of the pixels in frame, shaped as (height, width, 4)" \
+    " bytes, without copying them. frame can be any of the types accepted by" \
+    " get_frame_arg(), and the view is only valid for as long as frame is. Note" \
+    " that memoryview only supports fully indexing single elements, as in" \
+    " view[y, x, channel], not slicing or partial indexing such as view[y, x]; to" \
+    " do these, pass the result to numpy.asarray() to get an ndarray sharing the" \
+    " same memory."
+    width, height = dimensions
+    nr_bytes = width * height * 4
+    if isinstance(frame, (bytearray, memoryview, array.array)) or hasattr(frame, "__array_interface__") :
+        pixels = memoryview(frame).cast("B")
+        if pixels.readonly :
+            raise TypeError("frame buffer must be writable")
+        #end if
+    else :
+        # go by address, e.g. for a ctypes pointer, whose own buffer only
+        # holds the pointer value, not the pixels
+        address = get_frame_arg(frame)
+        if address == None :
+            raise TypeError("no frame to view")
+        #end if
+        pixels = memoryview((ct.c_ubyte * nr_bytes).from_address(address)).cast("B")
+    #end if
+    if len(pixels) < nr_bytes :
+        raise ValueError("frame buffer too small for dimensions")
+    #end if
+    return \
+        pixels[:nr_bytes].cast("B", (height, width, 4))
+#end frame_as_memoryview
+
 class Plugin :
     "wrapper class for a Frei0r plugin. Can be instantiated directly from" \
     " the pathname of a .so file; otherwise, use find_all or get_all to get these."
 
-    __slots__ = ("_lib", "info", "_params", "_params_by_name")
+    __slots__ = \
+        (
+            "_lib", "info", "_params", "_params_by_name",
+            # bound entry points, so per-frame calls need not look them up again:
+            "_f0r_construct", "_f0r_destruct",
+            "_f0r_get_param_value", "_f0r_set_param_value",
+            "_f0r_update", "_f0r_update2",
+        )
 
     def __init__(self, libname) :
         self._lib = None # in case of error
         lib = ct.CDLL(libname)
         lib.f0r_init()
         self._lib = lib
+        # Note all the void functions are explicitly declared as such, so ctypes
+        # doesn’t waste time converting a meaningless int result on every call.
+        lib.f0r_deinit.argtypes = ()
+        lib.f0r_deinit.restype = None
         lib.f0r_get_plugin_info.argtypes = (ct.POINTER(F0R.plugin_info_t),)
+        lib.f0r_get_plugin_info.restype = None
         lib.f0r_get_param_info.argtypes = (ct.POINTER(F0R.param_info_t), ct.c_int)
+        lib.f0r_get_param_info.restype = None
         lib.f0r_construct.argtypes = (ct.c_uint, ct.c_uint)
         lib.f0r_construct.restype = F0R.instance_t
         lib.f0r_destruct.argtypes = (F0R.instance_t,)
+        lib.f0r_destruct.restype = None
         lib.f0r_set_param_value.argtypes = (F0R.instance_t, F0R.param_t, ct.c_int)
+        lib.f0r_set_param_value.restype = None
         lib.f0r_get_param_value.argtypes = (F0R.instance_t, F0R.param_t, ct.c_int)
+        lib.f0r_get_param_value.restype = None
         if hasattr(lib, "f0r_update") :
             lib.f0r_update.argtypes = (F0R.instance_t, ct.c_double, ct.c_void_p, ct.c_void_p)
+            lib.f0r_update.restype = None
         #end if
         if hasattr(lib, "f0r_update2") :
             lib.f0r_update2.argtypes = (F0R.instance_t, ct.c_double, ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_void_p)
+            lib.f0r_update2.restype = None
         #end if
-        c_info = F0R.plugin_info_t()
+        self._f0r_construct = lib.f0r_construct
+        self._f0r_destruct = lib.f0r_destruct
+        self._f0r_get_param_value = lib.f0r_get_param_value
+        self._f0r_set_param_value = lib.f0r_set_param_value
+        self._f0r_update = getattr(lib, "f0r_update", None)
+        self._f0r_update2 = getattr(lib, "f0r_update2", None)
+        c_info = _scratch_struct(F0R.plugin_info_t)
         lib.f0r_get_plugin_info(ct.byref(c_info))
         self.info = decode_struct(c_info, F0R.plugin_info_t, plugin_info, {"plugin_type" : PLUGIN_TYPE, "colour_model" : COLOUR_MODEL}, ())
         # defer filling in of params info until it’s actually needed
@@ -416,38 +804,94 @@ class Plugin :
 
     def _get_params(self) :
         if self._params == None :
-            self._params = []
-            self._params_by_name = {}
-            c_info = F0R.param_info_t()
+            params = []
             for i in range(self.info.num_params) :
+                c_info = _scratch_struct(F0R.param_info_t)
+                  # cleared each time, so an optional field not filled in by
+                  # the plugin doesn’t pick up the value for the previous param
                 self._lib.f0r_get_param_info(ct.byref(c_info), i)
-                param = decode_struct(c_info, F0R.param_info_t, param_info, {"type" : PARAM}, (i,))
-                self._params.append(param)
-                self._params_by_name[param.name] = param
+                params.append(ParamInfo.from_struct(c_info, i))
             #end for
+            self._params_by_name = types.MappingProxyType(dict((p.name, p) for p in params))
+            self._params = tuple(params)
         #end if
     #end _get_params
 
     @property
     def params(self) :
-        "information about the parameters to this Plugin."
+        "information about the parameters to this Plugin, as a read-only mapping" \
+        " keyed by parameter name."
         self._get_params()
         return \
             self._params_by_name
     #end params
 
+    @property
+    def native_format(self) :
+        "the PIXMAN format code corresponding to the plugin’s colour model, or None" \
+        " if the plugin does not care about the arrangement of the channels."
+        return \
+            {
+                COLOUR_MODEL.BGRA8888 : PIXMAN.a8r8g8b8, # same as Cairo’s FORMAT_ARGB32
+                COLOUR_MODEL.RGBA8888 : PIXMAN.a8b8g8r8,
+                COLOUR_MODEL.PACKED32 : None,
+            }[self.info.colour_model]
+    #end native_format
+
+    def make_compatible_surface(self, dimensions) :
+        "creates a new frame buffer of the given dimensions whose channel order matches" \
+        " that of the plugin, so that passing it to update or update2 never needs any" \
+        " rearrangement of R and B channels. This is a qahirah.ImageSurface where" \
+        " Cairo’s channel order is suitable, otherwise a pixman.Image."
+        width, height = check_dimensions_ok(dimensions)
+        if self.native_format == PIXMAN.a8b8g8r8 :
+            result = pixman.Image.create_bits \
+              (
+                format = PIXMAN.a8b8g8r8,
+                dimensions = Vector(width, height)
+              )
+        else :
+            result = qah.ImageSurface.create \
+              (
+                format = qah.CAIRO.FORMAT_ARGB32,
+                dimensions = Vector(width, height)
+              )
+        #end if
+        return \
+            result
+    #end make_compatible_surface
+
     class Instance :
         "wrapper class for a Frei0r plugin instance. Do not instantiate directly; get" \
         " from a call to Plugin.construct()."
 
-        __slots__ = ("_instance", "_parent", "_lib", "dimensions", "rearrange")
+        __slots__ = \
+            (
+                "_instance", "_parent", "dimensions", "rearrange",
+                "_f0r_destruct", "_f0r_get_param_value", "_f0r_set_param_value",
+                "_f0r_update", "_f0r_update2", "_bound", "_param_scratch", "_param_scratch_ref",
+                "_scratch_in", "_params", "_params_by_name",
+            )
 
         def __init__(self, instance, parent, dimensions, rearrange) :
             self._instance = instance
             self._parent = parent
-            self._lib = parent._lib
+            self._f0r_destruct = parent._f0r_destruct
+            self._f0r_get_param_value = parent._f0r_get_param_value
+            self._f0r_set_param_value = parent._f0r_set_param_value
+            self._f0r_update = parent._f0r_update
+            self._f0r_update2 = parent._f0r_update2
             self.dimensions = dimensions
             self.rearrange = rearrange
+            self._bound = None
+            self._params = None # loaded as needed
+            self._params_by_name = None
+            self._param_scratch = None
+              # reusable ctypes objects for param values, indexed by param index
+            self._param_scratch_ref = None
+              # references to pass for the above
+            self._scratch_in = [None] * 3
+              # reusable images for rearranging each input frame, allocated as needed
         #end __init__
 
         def __repr__(self) :
@@ -457,53 +901,90 @@ class Plugin :
 
         def __del__(self) :
             if self._parent != None and self._parent._lib != None and self._instance != None :
-                self._parent._lib.f0r_destruct(self._instance)
+                self._f0r_destruct(self._instance)
                 self._instance = None
             #end if
         #end __del__
 
         def __len__(self) :
             "the number of parameters."
-            self._parent._get_params()
             return \
-                len(self._parent._params)
+                len(self._load_params())
         #end __len__
 
-        def __getitem__(self, paramid) :
-            "retrieves parameter value; paramid can be integer index or string name."
-            self._parent._get_params()
-            if isinstance(paramid, int) :
-                param = self._parent._params[paramid]
+        def _load_params(self) :
+            # ensures the parent’s parameter tables are loaded, and keeps direct
+            # references to them for quicker access.
+            if self._params == None :
+                self._parent._get_params()
+                params = self._parent._params
+                self._param_scratch = tuple(param._ctype() for param in params)
+                self._param_scratch_ref = tuple(ct.byref(c_value) for c_value in self._param_scratch)
+                self._params_by_name = self._parent._params_by_name
+                self._params = params
+            #end if
+            return \
+                self._params
+        #end _load_params
+
+        def _resolve_param(self, paramid) :
+            # returns the ParamInfo for paramid, which can be integer index or string name.
+            if self._params == None :
+                self._load_params()
+            #end if
+            # exact type tests first, as these are the usual cases and cheaper than isinstance
+            if type(paramid) is str :
+                param = self._params_by_name[paramid]
+            elif type(paramid) is int or isinstance(paramid, int) :
+                param = self._params[paramid]
             elif isinstance(paramid, str) :
-                param = self._parent._params_by_name[paramid]
+                param = self._params_by_name[paramid]
             else :
                 raise TypeError("param must be identified by index or name")
             #end if
-            c_result = param.type.f0r_type()
-            self._lib.f0r_get_param_value(self._instance, ct.byref(c_result), param.index)
             return \
-                param.type.from_f0r(c_result)
+                param
+        #end _resolve_param
+
+        def __getitem__(self, paramid) :
+            "retrieves parameter value; paramid can be integer index or string name."
+            param = self._resolve_param(paramid)
+            return \
+                self._get_param(param)
         #end __getitem__
 
+        def _get_param(self, param) :
+            index = param.index
+            self._f0r_get_param_value(self._instance, self._param_scratch_ref[index], index)
+            return \
+                param._from_f0r(self._param_scratch[index])
+        #end _get_param
+
         def __setitem__(self, paramid, newvalue) :
             "sets new parameter value; paramid can be integer index or string name."
-            self._parent._get_params()
-            if isinstance(paramid, int) :
-                param = self._parent._params[paramid]
-            elif isinstance(paramid, str) :
-                param = self._parent._params_by_name[paramid]
-            else :
-                raise TypeError("param must be identified by index or name")
-            #end if
-            c_value = param.type.f0r_type()
-            param.type.to_f0r(newvalue, c_value)
-            self._lib.f0r_set_param_value(self._instance, ct.byref(c_value), param.index)
+            param = self._resolve_param(paramid)
+            index = param.index
+            param._to_f0r(newvalue, self._param_scratch[index])
+            self._f0r_set_param_value(self._instance, self._param_scratch_ref[index], index)
         #end __setitem__
 
+        def get_param_bytes(self, paramid) :
+            "retrieves the value of a string parameter as bytes, without decoding it;" \
+            " paramid can be integer index or string name. Setting a string parameter" \
+            " to a bytes value similarly skips the encoding step."
+            param = self._resolve_param(paramid)
+            if param.type != PARAM.STRING :
+                raise TypeError("param “%s” is not a string" % param.name)
+            #end if
+            index = param.index
+            self._f0r_get_param_value(self._instance, self._param_scratch_ref[index], index)
+            return \
+                self._param_scratch[index].value
+        #end get_param_bytes
+
         def __iter__(self) :
             "iterating over parameter names."
-            self._parent._get_params()
-            for param in self._parent._params :
+            for param in self._load_params() :
                 yield param.name
             #end for
         #end __iter__
@@ -511,12 +992,9 @@ class Plugin :
         @property
         def params(self) :
             "parameter settings as an updateable dict."
-            result = {}
-            for paramname in self :
-                result[paramname] = self[paramname]
-            #end for
+            # no need to look up each param again by name
             return \
-                result
+                dict((param.name, self._get_param(param)) for param in self._load_params())
         #end params
 
         @params.setter
@@ -526,19 +1004,50 @@ class Plugin :
             #end for
         #end params
 
+        def as_memoryview(self, frame) :
+            "returns a zero-copy memoryview of frame as (height, width, 4) bytes," \
+            " according to the dimensions of this instance. See frame_as_memoryview()."
+            return \
+                frame_as_memoryview(frame, self.dimensions)
+        #end as_memoryview
+
         class ChannelRearranger :
             "rearranges R and B channels as necessary to convert between RGBA8888 colour" \
             " model and Cairo’s channel ordering, which corresponds to BGRA8888."
 
-            __slots__ = ("_parentobj", "rearrange", "src", "dst")
+            __slots__ = ("_parentobj", "rearrange", "src", "dst", "_inplace", "_dimensions")
 
-            def __init__(self, baseaddr, dimensions, parentobj, out, rearrange) :
-                baseaddr = get_frame_arg(baseaddr)
-                if baseaddr == None :
+            def __init__(self, baseaddr, dimensions, parentobj, out, rearrange, scratch = None) :
+                # scratch, if not None, is a (list, index) pair specifying where to
+                # find, or failing that save, an image to reuse for copying input pixels.
+                if rearrange and isinstance(baseaddr, pixman.Image) and baseaddr.format == PIXMAN.a8b8g8r8 :
+                    rearrange = False # already in plugin’s RGBA8888 channel order
+                #end if
+                frame = baseaddr
+                if out :
+                    baseaddr = _get_out_frame_arg(baseaddr)
+                else :
+                    baseaddr = get_frame_arg(baseaddr)
+                #end if
+                if baseaddr is None :
                     rearrange = False # no pixels to rearrange
                 #end if
                 self.rearrange = rearrange
-                if rearrange :
+                self._inplace = None
+                self._dimensions = dimensions
+                if rearrange and out :
+                    # plugin writes straight to frame, which is then rearranged in-place,
+                    # saving a full-frame copy
+                    self.src = baseaddr
+                    self.dst = baseaddr
+                    nr_bytes = dimensions.x * dimensions.y * 4
+                    if type(frame) is bytearray and len(frame) == nr_bytes :
+                        # swap_red_blue can work on this directly, without staging copies
+                        self._inplace = frame
+                    else :
+                        self._inplace = (ct.c_ubyte * nr_bytes).from_address(baseaddr)
+                    #end if
+                elif rearrange :
                     orig = pixman.Image.create_bits \
                       (
                         format = PIXMAN.a8r8g8b8,
@@ -546,20 +1055,26 @@ class Plugin :
                         bits = baseaddr,
                         stride = dimensions.x * 4 # should be correct, given constraints on dimensions
                       )
-                    copy = pixman.Image.create_bits \
-                      (
-                        format = PIXMAN.a8b8g8r8,
-                          # doesn’t really matter which of orig/copy is which format,
-                          # just so long as they’re different
-                        dimensions = dimensions
-                      )
-                    if out :
-                        self.src = copy # plugin writes to copy
-                        self.dst = orig
+                    if scratch != None :
+                        images, index = scratch
+                        copy = images[index]
                     else :
-                        self.src = orig
-                        self.dst = copy # plugin reads from copy
+                        copy = None
                     #end if
+                    if copy == None :
+                        copy = pixman.Image.create_bits \
+                          (
+                            format = PIXMAN.a8b8g8r8,
+                              # doesn’t really matter which of orig/copy is which format,
+                              # just so long as they’re different
+                            dimensions = dimensions
+                          )
+                        if scratch != None :
+                            images[index] = copy
+                        #end if
+                    #end if
+                    self.src = orig
+                    self.dst = copy # plugin reads from copy
                 else :
                     self.src = baseaddr
                     self.dst = baseaddr
@@ -567,10 +1082,39 @@ class Plugin :
                 self._parentobj = parentobj # just to ensure it doesn’t go away prematurely
             #end __init__
 
-            def convert(self) :
+            def convert(self, dirty = None) :
                 "actually implements the channel rearrangement. Returns the output" \
-                " buffer, which is handy for input conversions."
-                if self.rearrange :
+                " buffer, which is handy for input conversions. For output conversions," \
+                " dirty can be a (left, top, width, height) tuple or qahirah.Rect," \
+                " limiting the rearrangement to just that part of the frame."
+                if self._inplace is not None :
+                    if dirty == None :
+                        swap_red_blue(self._inplace)
+                    else :
+                        if isinstance(dirty, qah.Rect) :
+                            dirty = (dirty.left, dirty.top, dirty.width, dirty.height)
+                        #end if
+                        left, top, width, height = dirty
+                        # expand to whole pixels, so any pixel partly covered
+                        # by the rectangle is included, then clip to frame
+                        right = min(math.ceil(left + width), self._dimensions.x)
+                        bottom = min(math.ceil(top + height), self._dimensions.y)
+                        left = max(math.floor(left), 0)
+                        top = max(math.floor(top), 0)
+                        if right > left and bottom > top :
+                            pixels = memoryview(self._inplace).cast("B")
+                            stride = self._dimensions.x * 4
+                            if left == 0 and right == self._dimensions.x :
+                                # whole rows, can do in one go
+                                swap_red_blue(pixels[top * stride : bottom * stride])
+                            else :
+                                for row in range(top * stride, bottom * stride, stride) :
+                                    swap_red_blue(pixels[row + left * 4 : row + right * 4])
+                                #end for
+                            #end if
+                        #end if
+                    #end if
+                elif self.rearrange :
                     pixman.image_composite \
                       (
                         op = PIXMAN.OP_SRC,
@@ -583,139 +1127,194 @@ class Plugin :
                         dimensions = self.src.dimensions
                       )
                 #end if
+                result = self.dst
+                if result is not None and hasattr(result, "data") :
+                    result = result.data
+                #end if
                 return \
-                    (lambda : None, lambda : (lambda : self.dst, lambda : self.dst.data)[hasattr(self.dst, "data")]())[self.dst != None]()
+                    result
             #end convert
 
             @property
             def buf(self) :
                 "returns the input buffer. Handy for output conversions."
+                result = self.src
+                if result is not None and hasattr(result, "data") :
+                    result = result.data
+                #end if
                 return \
-                    (lambda : None, lambda : (lambda : self.src, lambda : self.src.data)[hasattr(self.src, "data")]())[self.src != None]()
+                    result
             #end buf
 
         #end ChannelRearranger
 
-        def update(self, time, inframe, outframe) :
+        def _wrap_in(self, frame, index) :
+            # returns a ChannelRearranger for passing frame as input number index
+            # to the plugin.
+            return \
+                self.ChannelRearranger \
+                  (
+                    baseaddr = frame,
+                    dimensions = self.dimensions,
+                    parentobj = frame,
+                    out = False,
+                    rearrange = self.rearrange,
+                    scratch = (self._scratch_in, index)
+                  )
+        #end _wrap_in
+
+        def _wrap_out(self, frame) :
+            # returns a ChannelRearranger for passing frame as output from the plugin.
+            return \
+                self.ChannelRearranger \
+                  (
+                    baseaddr = frame,
+                    dimensions = self.dimensions,
+                    parentobj = frame,
+                    out = True,
+                    rearrange = self.rearrange
+                  )
+        #end _wrap_out
+
+        def update(self, time, inframe, outframe, dirty = None) :
             "invokes the plugin on the single input inframe, to produce its output in outframe." \
             " inframe and outframe can be qahirah.ImageSurface objects, pixman.Image objects," \
-            " bytearray or array.array objects, or even just raw pointer addresses."
-            if not hasattr(self._parent._lib, "f0r_update") :
+            " bytearray, memoryview or array.array objects, NumPy arrays, or even just raw" \
+            " pointer addresses. If R and B channels need rearranging, dirty can be a" \
+            " (left, top, width, height) tuple or qahirah.Rect limiting this to the part" \
+            " of outframe that the caller is interested in; the rest of outframe is then" \
+            " left with the channels in the plugin’s order."
+            if self._f0r_update == None :
                 raise NotImplementedError("plugin has no update method")
             #end if
-            inframe_r = self.ChannelRearranger \
-              (
-                baseaddr = inframe,
-                dimensions = self.dimensions,
-                parentobj = inframe,
-                out = False,
-                rearrange = self.rearrange
-              )
-            outframe_r = self.ChannelRearranger \
-              (
-                baseaddr = outframe,
-                dimensions = self.dimensions,
-                parentobj = outframe,
-                out = True,
-                rearrange = self.rearrange
-              )
-            self._parent._lib.f0r_update \
-              (
-                self._instance,
-                time,
-                inframe_r.convert(),
-                outframe_r.buf
-              )
-            outframe_r.convert()
+            if not self.rearrange :
+                # common case, frames can be passed straight through
+                self._f0r_update(self._instance, time, get_frame_arg(inframe), _get_out_frame_arg(outframe))
+            else :
+                outframe_r = self._wrap_out(outframe)
+                self._f0r_update(self._instance, time, self._wrap_in(inframe, 0).convert(), outframe_r.buf)
+                outframe_r.convert(dirty)
+            #end if
             if isinstance(outframe, qah.ImageSurface) :
                 outframe.mark_dirty()
             #end if
         #end update
 
-        def update2(self, time, inframe1, inframe2, inframe3, outframe) :
+        def update2(self, time, inframe1, inframe2, inframe3, outframe, dirty = None) :
             "invokes the plugin on up to 3 input inframes, to produce its output in outframe." \
             " The inframes and outframe can be qahirah.ImageSurface objects, pixman.Image" \
-            " objects, bytearray or array.array objects, or even just raw pointer addresses."
-            if hasattr(self._parent._lib, "f0r_update2") :
-                inframe1_r = self.ChannelRearranger \
-                  (
-                    baseaddr = inframe1,
-                    dimensions = self.dimensions,
-                    parentobj = inframe1,
-                    out = False,
-                    rearrange = self.rearrange
-                  )
-                inframe2_r = self.ChannelRearranger \
-                  (
-                    baseaddr = inframe2,
-                    dimensions = self.dimensions,
-                    parentobj = inframe2,
-                    out = False,
-                    rearrange = self.rearrange
-                  )
-                inframe3_r = self.ChannelRearranger \
-                  (
-                    baseaddr = inframe3,
-                    dimensions = self.dimensions,
-                    parentobj = inframe3,
-                    out = False,
-                    rearrange = self.rearrange
-                  )
-                outframe_r = self.ChannelRearranger \
-                  (
-                    baseaddr = outframe,
-                    dimensions = self.dimensions,
-                    parentobj = outframe,
-                    out = True,
-                    rearrange = self.rearrange
-                  )
-                self._parent._lib.f0r_update2 \
+            " objects, bytearray, memoryview or array.array objects, NumPy arrays, or even" \
+            " just raw pointer addresses. dirty is as for update()."
+            if self._f0r_update2 == None :
+                if inframe2 is not None or inframe3 is not None :
+                    raise NotImplementedError("plugin has no update2 method")
+                #end if
+                self.update(time, inframe1, outframe, dirty)
+                return
+            #end if
+            if not self.rearrange :
+                # common case, frames can be passed straight through
+                self._f0r_update2 \
                   (
                     self._instance,
                     time,
-                    inframe1_r.convert(),
-                    inframe2_r.convert(),
-                    inframe3_r.convert(),
-                    outframe_r.buf
+                    get_frame_arg(inframe1),
+                    get_frame_arg(inframe2),
+                    get_frame_arg(inframe3),
+                    _get_out_frame_arg(outframe)
                   )
-                outframe_r.convert()
             else :
-                if inframe2 != None or inframe3 != None :
-                    raise NotImplementedError("plugin has no update2 method")
-                #end if
-                if not hasattr(self._parent._lib, "f0r_update") :
-                    raise NotImplementedError("plugin has no update method")
-                #end if
-                inframe1_r = self.ChannelRearranger \
-                  (
-                    baseaddr = inframe1,
-                    dimensions = self.dimensions,
-                    parentobj = inframe1,
-                    out = False,
-                    rearrange = self.rearrange
-                  )
-                outframe_r = self.ChannelRearranger \
-                  (
-                    baseaddr = outframe,
-                    dimensions = self.dimensions,
-                    parentobj = outframe,
-                    out = True,
-                    rearrange = self.rearrange
-                  )
-                self._parent._lib.f0r_update \
+                outframe_r = self._wrap_out(outframe)
+                self._f0r_update2 \
                   (
                     self._instance,
                     time,
-                    inframe1_r.convert(),
+                    self._wrap_in(inframe1, 0).convert(),
+                    self._wrap_in(inframe2, 1).convert(),
+                    self._wrap_in(inframe3, 2).convert(),
                     outframe_r.buf
                   )
-                outframe_r.convert()
+                outframe_r.convert(dirty)
             #end if
             if isinstance(outframe, qah.ImageSurface) :
                 outframe.mark_dirty()
             #end if
         #end update2
 
+        def update_batch(self, times, inframes, outframes) :
+            "invokes update() on successive elements of the sequences times, inframes" \
+            " and outframes, in order."
+            for time, inframe, outframe in zip(times, inframes, outframes) :
+                self.update(time, inframe, outframe)
+            #end for
+        #end update_batch
+
+        def update_raw(self, time, inaddr, outaddr) :
+            "lowest-overhead form of update(): inaddr and outaddr must be integer" \
+            " addresses (or None), which are passed straight to the plugin, with no" \
+            " channel rearrangement or other processing."
+            if self._f0r_update == None :
+                raise NotImplementedError("plugin has no update method")
+            #end if
+            self._f0r_update(self._instance, time, inaddr, outaddr)
+        #end update_raw
+
+        def update2_raw(self, time, inaddr1, inaddr2, inaddr3, outaddr) :
+            "lowest-overhead form of update2(): the frames must be integer addresses" \
+            " (or None), which are passed straight to the plugin, with no channel" \
+            " rearrangement or other processing."
+            if self._f0r_update2 == None :
+                raise NotImplementedError("plugin has no update2 method")
+            #end if
+            self._f0r_update2(self._instance, time, inaddr1, inaddr2, inaddr3, outaddr)
+        #end update2_raw
+
+        def bind_surfaces(self, inframe, outframe) :
+            "sets up inframe and outframe for repeated processing by update_bound()," \
+            " so that the work of getting their addresses and setting up any channel" \
+            " rearrangement is only done once. The frames can be any of the types" \
+            " accepted by update(). They remain referenced by this Instance until" \
+            " unbind() or another bind_surfaces() call."
+            if self._f0r_update == None :
+                raise NotImplementedError("plugin has no update method")
+            #end if
+            inframe_r = self._wrap_in(inframe, 0)
+            outframe_r = self._wrap_out(outframe)
+            if isinstance(outframe, qah.ImageSurface) :
+                mark_dirty = outframe.mark_dirty
+            else :
+                mark_dirty = None
+            #end if
+            if inframe_r.rearrange or outframe_r.rearrange :
+                self._bound = (None, None, inframe_r, outframe_r, mark_dirty)
+            else :
+                # can pass the addresses straight through on every call
+                self._bound = (inframe_r.buf, outframe_r.buf, inframe_r, outframe_r, mark_dirty)
+            #end if
+        #end bind_surfaces
+
+        def unbind(self) :
+            "forgets the frames set up by bind_surfaces()."
+            self._bound = None
+        #end unbind
+
+        def update_bound(self, time) :
+            "invokes the plugin on the frames previously set up with bind_surfaces()."
+            if self._bound == None :
+                raise RuntimeError("no frames bound to plugin instance")
+            #end if
+            inaddr, outaddr, inframe_r, outframe_r, mark_dirty = self._bound
+            if outaddr != None :
+                self._f0r_update(self._instance, time, inaddr, outaddr)
+            else :
+                self._f0r_update(self._instance, time, inframe_r.convert(), outframe_r.buf)
+                outframe_r.convert()
+            #end if
+            if mark_dirty != None :
+                mark_dirty()
+            #end if
+        #end update_bound
+
     #end Instance
 
     def construct(self, dimensions, rearrange = True) :
@@ -723,7 +1322,7 @@ class Plugin :
         " dimensions. rearrange indicates whether to rearrange R and B channels as" \
         " necessary to agree with Cairo’s FORMAT_ARGB32 channel ordering."
         width, height = check_dimensions_ok(dimensions)
-        instance = self._lib.f0r_construct(width, height)
+        instance = self._f0r_construct(width, height)
         if instance == None :
             raise RuntimeError \
               (
@@ -740,4 +1339,83 @@ class Plugin :
               )
     #end construct
 
+    class InstancePool :
+        "a set of independent instances of the same Plugin, for processing batches of" \
+        " frames in parallel. Do not instantiate directly; get from a call to" \
+        " Plugin.construct_pool()."
+
+        __slots__ = ("instances", "_executor")
+
+        def __init__(self, instances) :
+            self._executor = None # in case of error
+            self.instances = tuple(instances)
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers = len(self.instances))
+        #end __init__
+
+        def close(self) :
+            "shuts down the worker threads. The pool cannot be used after this."
+            if self._executor != None :
+                self._executor.shutdown()
+                self._executor = None
+            #end if
+        #end close
+
+        def __del__(self) :
+            self.close()
+        #end __del__
+
+        def __setitem__(self, paramid, newvalue) :
+            "sets a parameter value on all the instances."
+            for instance in self.instances :
+                instance[paramid] = newvalue
+            #end for
+        #end __setitem__
+
+        def update_batch(self, times, inframes, outframes) :
+            "invokes update() on successive elements of the sequences times, inframes" \
+            " and outframes, dealing them out in turn to the instances in the pool," \
+            " which run in parallel. Returns when all frames have been processed." \
+            " Note that plugins whose output depends on previously-processed frames" \
+            " will not give the same results as processing all the frames with a" \
+            " single instance."
+            if self._executor == None :
+                raise RuntimeError("instance pool has been closed")
+            #end if
+            frames = tuple(zip(times, inframes, outframes))
+            nr_instances = len(self.instances)
+            # each instance processes its share of the frames in order, since
+            # a single Frei0r instance cannot safely be used from multiple threads
+            tasks = tuple \
+              (
+                self._executor.submit
+                  (
+                    instance.update_batch,
+                    *zip(*frames[i::nr_instances])
+                  )
+                for i, instance in enumerate(self.instances)
+                if i < len(frames)
+              )
+            for task in tasks :
+                task.result() # propagate any exception
+            #end for
+        #end update_batch
+
+    #end InstancePool
+
+    def construct_pool(self, dimensions, nr_instances, rearrange = True) :
+        "constructs an InstancePool of nr_instances independent instances of this Plugin," \
+        " for processing frames in parallel threads. The other args are as for construct()." \
+        " ctypes releases the GIL while the plugin is working, so the instances can make" \
+        " use of multiple CPU cores."
+        if nr_instances <= 0 :
+            raise ValueError("nr_instances must be at least 1")
+        #end if
+        return \
+            type(self).InstancePool \
+              (
+                self.construct(dimensions, rearrange)
+                for i in range(nr_instances)
+              )
+    #end construct_pool
+
 #end Plugin
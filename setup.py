@@ -14,7 +14,7 @@ distutils.core.setup \
   (
     name = "py0r",
     version = "0.8",
-    description = "language bindings for the Frei0r effects plugins, for Python 3.4 or later",
+    description = "language bindings for the Frei0r effects plugins, for Python 3.6 or later",
     author = "Lawrence D'Oliveiro",
     author_email = "ldo@geek-central.gen.nz",
     url = "https://github.com/ldo/py0r",